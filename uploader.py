@@ -19,13 +19,16 @@ Features:
 - Configurable parallelism for uploading multiple chapters simultaneously.
 - Pauses at the end of execution to allow users to read the final summary.
 """
-import cloudscraper, json, os, re, sys, threading, time
+import cloudscraper, functools, itertools, json, os, re, sys, threading, time
 from pathlib import Path
 from urllib.parse import urlparse, quote
-from PIL import Image
+from PIL import Image, features
 import io
 import concurrent.futures
+import multiprocessing
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from colorama import init, Fore, Style
 
 init(autoreset=True) # Initialize Colorama
@@ -33,50 +36,83 @@ init(autoreset=True) # Initialize Colorama
 # --- Configuration & Constants ---
 API_BASE_URL = "https://api.comick.io"; UPLOAD_API_BASE_URL = "https://upload.comick.io/v1.0"
 COOKIES_FILE = "cookies.txt"; DEFAULT_CHAPTERS_DIR = "chapters"
-SUPPORTED_EXTENSIONS = ['.jpeg', '.jpg', '.png', '.gif', '.webp', '.bmp', '.tiff', '.heic']
+JPEG_QUALITY = 90
+MAX_PAGE_WIDTH = 2400 # px
+JPEG_EXTENSIONS = ('.jpg', '.jpeg'); MAX_PASSTHROUGH_SIZE = 10 * 1024 * 1024 # bytes
+PASSTHROUGH_BLOCKING_METADATA = ('exif', 'xmp', 'photoshop', 'comment') # metadata the old re-encode stripped
+SUPPORTED_EXTENSIONS = frozenset(('.jpeg', '.jpg', '.png', '.gif', '.webp', '.bmp', '.tiff', '.heic'))
 MAX_RETRIES = 3; RETRY_DELAY = 10 # seconds
+API_TIMEOUT = (10, 120) # (connect, read) seconds; outlasts Cloudflare's 100s limit
+S3_TIMEOUT = (5, 60); S3_HEADERS = {"Content-Type": "image/jpeg"} # (connect, read) seconds
 RETRYABLE_STATUSES = [500, 502, 503, 504, 524]
+RENDER_INTERVAL = 0.1 # seconds between UI frames
+PAGE_WINDOW = 16 # pages per chapter being encoded or uploaded at once
+MAX_PARALLEL_CHAPTERS = 10; MAX_INFLIGHT_PUTS = 32 # cap on concurrent S3 PUTs across all chapters
 LANGUAGES = {"en": "English", "fr": "French", "es-419": "Spanish (Latin American)", "pt-br": "Brazilian Portuguese","pl": "Polish", "ru": "Russian", "ms": "Malay", "it": "Italian", "id": "Indonesian", "hi": "Hindi","de": "German", "uk": "Ukrainian", "vi": "Vietnamese", "tl": "Filipino/Tagalog", "bn": "Bengali","ar": "Arabic", "es": "Spanish (Castilian)", "tr": "Turkish"}
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:142.0) Gecko/20100101 Firefox/142.0","Accept": "application/json, text/plain, */*","Accept-Language": "en-US,en;q=0.5","Accept-Encoding": "gzip, deflate, br, zstd","Origin": "https://comick.io","Referer": "https://comick.io/","DNT": "1","Sec-GPC": "1","Sec-Fetch-Dest": "empty","Sec-Fetch-Mode": "cors","Sec-Fetch-Site": "same-site","Connection": "keep-alive"}
 
+S3_RETRY = Retry(total=3, backoff_factor=1, status_forcelist=RETRYABLE_STATUSES, allowed_methods=['PUT'], raise_on_status=False) # per-PUT retries, so one flaky page doesn't restart its chapter
+API_RETRY = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 504, 524], allowed_methods=['GET'], raise_on_status=False) # add-chapter isn't idempotent; 503 is left to cloudscraper
+S3_SESSION = requests.Session()
+S3_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=MAX_INFLIGHT_PUTS, max_retries=S3_RETRY))
+PAGE_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_INFLIGHT_PUTS, thread_name_prefix='s3-put')
+TURBOJPEG = None; TURBOJPEG_FORMATS = {}; NUMPY = None # set by load_turbojpeg()
+ENCODE_POOL = None # started in main()
+
 class Colors:
     GREEN = Fore.GREEN; RED = Fore.RED; YELLOW = Fore.YELLOW; CYAN = Fore.CYAN; RESET = Style.RESET_ALL
 
 # --- Robust Paginated UI Renderer Class ---
 class UIRenderer:
+    BAR_FILLS = {width: tuple(('#' * i).ljust(width) for i in range(width + 1)) for width in (20, 40)}
     def __init__(self, chapter_keys):
-        self.lock = threading.Lock()
         self.sorted_keys = chapter_keys
         self.total_chapters = len(chapter_keys)
-        self.completed_chapters = 0
+        self.completed_chapters = 0; self._completed_counter = itertools.count(1)
         self.status = {key: {"status": "Queued", "progress": 0.0} for key in chapter_keys}
         self.height = 0; self.page_size = 25; self.view_start_index = 0
+        self.last_frame = []
+        self._dirty = threading.Event(); self._stopped = threading.Event(); self._thread = threading.Thread(target=self._render_loop, daemon=True)
 
-    def _render(self):
-        if self.height > 0: sys.stdout.write(f"\033[{self.height}A")
+    def _build_frame(self):
         overall_progress = self.completed_chapters / self.total_chapters if self.total_chapters > 0 else 0
-        overall_bar = f"[{'#' * int(overall_progress * 40):<40}]"
-        sys.stdout.write(f"{Colors.CYAN}--- Uploading ({self.completed_chapters}/{self.total_chapters}) {overall_bar} {overall_progress*100:3.0f}% ---\033[K\n")
+        overall_bar = f"[{self.BAR_FILLS[40][min(40, int(overall_progress * 40))]}]"
+        lines = [f"{Colors.CYAN}--- Uploading ({self.completed_chapters}/{self.total_chapters}) {overall_bar} {overall_progress*100:3.0f}% ---{Colors.RESET}"]
         end_index = min(self.view_start_index + self.page_size, self.total_chapters)
-        chapters_to_display = self.sorted_keys[self.view_start_index:end_index]
-        for key in chapters_to_display:
+        for key in self.sorted_keys[self.view_start_index:end_index]:
             info = self.status[key]; status_text, progress = info["status"], info["progress"]
             bar_color = Colors.GREEN if progress == 1.0 and ("✅" in status_text or "Skipped" in status_text) else (Colors.RED if "❌" in status_text else Colors.YELLOW)
-            bar = f"[{bar_color}{'#' * int(progress * 20):<20}{Colors.RESET}]"
+            bar = f"[{bar_color}{self.BAR_FILLS[20][min(20, int(progress * 20))]}{Colors.RESET}]"
             status_color = Colors.GREEN if "✅" in status_text or "Skipped" in status_text else (Colors.RED if "❌" in status_text else "")
-            line = f"  {key:<20.20}: {status_color}{status_text:<25.25}{Colors.RESET} {bar} {progress*100:3.0f}%"
-            sys.stdout.write(f"{line}\033[K\n")
-        self.height = 1 + len(chapters_to_display); sys.stdout.flush()
+            lines.append(f"  {key:<20.20}: {status_color}{status_text:<25.25}{Colors.RESET} {bar} {progress*100:3.0f}%")
+        return lines
+
+    def _render(self):
+        frame = self._build_frame()
+        if len(frame) != len(self.last_frame):
+            out = [f"\033[{self.height}A"] if self.height > 0 else []
+            out += [f"{line}\033[K\n" for line in frame]; out.append("\033[J")
+        else:
+            out, row = [], self.height
+            for i, (old, line) in enumerate(zip(self.last_frame, frame)):
+                if old == line: continue
+                out.append(f"\033[{row - i}A\r{line}\033[K" if row > i else f"\033[{i - row}B\r{line}\033[K"); row = i
+            if out: out.append(f"\033[{self.height - row}B\r")
+        self.last_frame = frame; self.height = len(frame)
+        if out: sys.stdout.write("".join(out)); sys.stdout.flush()
+
+    def _render_loop(self):
+        while not self._stopped.is_set():
+            if self._dirty.wait(timeout=RENDER_INTERVAL):
+                self._dirty.clear(); self._check_and_scroll_view(); self._render()
+            self._stopped.wait(RENDER_INTERVAL)
+        self._check_and_scroll_view(); self._render()
 
     def update_chapter_status(self, chap_key, status, progress=None):
-        with self.lock:
-            if chap_key not in self.status: self.status[chap_key] = {}
-            self.status[chap_key]["status"] = status
-            if progress is not None: self.status[chap_key]["progress"] = progress
-            if self.status[chap_key]["progress"] == 1.0:
-                self.completed_chapters += 1
-                self._check_and_scroll_view()
-            self._render()
+        if progress is None: progress = self.status.get(chap_key, {}).get("progress", 0.0)
+        self.status[chap_key] = {"status": status, "progress": progress} # atomic, no lock needed
+        if progress == 1.0: self.completed_chapters = next(self._completed_counter)
+        self._dirty.set()
 
     def _check_and_scroll_view(self):
         end_index = min(self.view_start_index + self.page_size, self.total_chapters)
@@ -88,18 +124,23 @@ class UIRenderer:
 
     def start(self):
         self.height = 1 + min(self.total_chapters, self.page_size); sys.stdout.write("\n" * self.height)
-        with self.lock: self._render()
+        self._render(); self._thread.start()
+
+    def stop(self):
+        self._stopped.set(); self._thread.join() # draws a final frame
 
 # --- Helper Functions ---
-def natural_sort_key(s): return [float(text) if re.match(r'^-?\d+(?:\.\d+)?$', text) else text.lower() for text in re.split(r'(-?\d+(?:\.\d+)?)', str(s))]
+_NUM_SPLIT_RE = re.compile(r'(-?\d+(?:\.\d+)?)'); _NUM_RE = re.compile(r'^-?\d+(?:\.\d+)?$'); _CHAPTER_RE = re.compile(r'^(\d+(?:\.\d+)?)(?:\s*-\s*(.+))?$')
+@functools.lru_cache(maxsize=4096)
+def natural_sort_key(s): return tuple(float(text) if _NUM_RE.match(text) else text.lower() for text in _NUM_SPLIT_RE.split(str(s)))
 def load_cookies():
     session = cloudscraper.create_scraper(browser={'browser': 'firefox', 'platform': 'windows', 'mobile': False}); session.headers.update(HEADERS)
+    api_adapter = cloudscraper.CipherSuiteAdapter(ssl_context=session.get_adapter("https://").ssl_context, pool_connections=4, pool_maxsize=2 * MAX_PARALLEL_CHAPTERS, max_retries=API_RETRY)
+    for base_url in (API_BASE_URL, UPLOAD_API_BASE_URL): session.mount(base_url, api_adapter)
     if not os.path.exists(COOKIES_FILE): print(f"{Colors.RED}Error: '{COOKIES_FILE}' not found."); return None
     try:
-        cookies_dict = {};
         with open(COOKIES_FILE, 'r', encoding='utf-8') as f: cookies_data = json.load(f)
-        for cookie in cookies_data: cookies_dict[cookie['name']] = cookie['value']
-        session.cookies.update(cookies_dict); print(f"{Colors.GREEN}✅ Cookies loaded successfully."); return session
+        session.cookies.update({cookie['name']: cookie['value'] for cookie in cookies_data}); print(f"{Colors.GREEN}✅ Cookies loaded successfully."); return session
     except Exception as e: print(f"{Colors.RED}❌ Error loading cookies: {e}"); return None
 def get_manga_slug(session):
     while True:
@@ -109,7 +150,7 @@ def get_manga_slug(session):
             if len(path_parts) >= 2 and path_parts[0] == 'comic':
                 slug = path_parts[1]
                 print(f"Validating manga '{slug}'...")
-                response = session.get(f"{API_BASE_URL}/comic/{slug}")
+                response = session.get(f"{API_BASE_URL}/comic/{slug}", timeout=API_TIMEOUT)
                 if response.status_code == 200:
                     print(f"{Colors.GREEN}✅ Manga found!{Colors.RESET}"); return slug
                 elif response.status_code == 404:
@@ -120,17 +161,33 @@ def get_manga_slug(session):
                 print(f"{Colors.RED}Invalid URL format. Please use the format: https://comick.io/comic/your-manga-slug{Colors.RESET}")
         except requests.RequestException as e:
             print(f"{Colors.RED}A network error occurred: {e}{Colors.RESET}")
+def fetch_existing_chapters(session, manga_slug, lang_code, group_info):
+    if "is_official" in group_info: return set() # not distinguishable in the listing
+    try:
+        response = session.get(f"{API_BASE_URL}/comic/{manga_slug}", timeout=API_TIMEOUT); response.raise_for_status(); comic_hid = response.json()["comic"]["hid"]
+        existing, page, page_size = set(), 1, 300
+        while True:
+            response = session.get(f"{API_BASE_URL}/comic/{comic_hid}/chapters", params={"lang": lang_code, "limit": page_size, "page": page}, timeout=API_TIMEOUT)
+            response.raise_for_status(); data = response.json(); chapters = data.get("chapters") or []
+            for chap in chapters:
+                groups = chap.get("group_name") or []
+                if chap.get("chap") and (group_info["name"] in groups if "groups" in group_info else not groups): existing.add(chap["chap"])
+            if not chapters or page * page_size >= data.get("total", 0): return existing
+            page += 1
+    except Exception as e:
+        print(f"{Colors.YELLOW}⚠️ Could not check for existing chapters ({e}). Duplicates will be detected during upload."); return set()
 def find_chapters(chapters_dir):
     if not os.path.isdir(chapters_dir): print(f"{Colors.RED}❌ Error: Directory '{chapters_dir}' not found."); return None
-    chapters, chapter_pattern = {}, re.compile(r'^\d+(\.\d+)?(\s*-\s*(.+))?$')
-    dir_entries = sorted(os.listdir(chapters_dir), key=natural_sort_key)
-    for entry in dir_entries:
-        chap_path = Path(chapters_dir) / entry; match = chapter_pattern.match(entry)
-        if chap_path.is_dir() and match:
-            chapter_number = match.group(0).split(' - ')[0]; title = match.group(3).strip() if match.group(3) else None
-            images = sorted([f for f in chap_path.iterdir() if f.is_file() and f.suffix.lower() in SUPPORTED_EXTENSIONS], key=lambda p: natural_sort_key(p.name))
-            if images: chapters[entry] = {"number": chapter_number, "title": title, "image_paths": images}
-            else: print(f"{Colors.YELLOW}⚠️ Warning: Chapter folder '{entry}' is empty. Skipping.")
+    chapters = {}
+    with os.scandir(chapters_dir) as it:
+        matches = ((e, _CHAPTER_RE.match(e.name)) for e in it)
+        dir_entries = sorted(((e, m) for e, m in matches if m and e.is_dir()), key=lambda em: natural_sort_key(em[0].name))
+    for chap_entry, match in dir_entries:
+        entry = chap_entry.name; chapter_number, title = match.group(1), (match.group(2) or '').strip() or None
+        with os.scandir(chap_entry.path) as it: image_entries = sorted((f for f in it if f.is_file() and os.path.splitext(f.name)[1].lower() in SUPPORTED_EXTENSIONS), key=lambda f: natural_sort_key(f.name))
+        images = [Path(f.path) for f in image_entries]
+        if images: chapters[entry] = {"number": chapter_number, "title": title, "image_paths": images}
+        else: print(f"{Colors.YELLOW}⚠️ Warning: Chapter folder '{entry}' is empty. Skipping.")
     if not chapters: print(f"{Colors.RED}❌ No valid chapter folders found in '{chapters_dir}'."); return None
     return chapters
 def select_group(session):
@@ -145,7 +202,7 @@ def select_group(session):
         search_term = input("Search for a scanlation group (or 'exit'): ")
         if search_term.lower() == 'exit': return None
         try:
-            response = session.get(f"{API_BASE_URL}/search/group?k={quote(search_term)}")
+            response = session.get(f"{API_BASE_URL}/search/group?k={quote(search_term)}", timeout=API_TIMEOUT)
             response.raise_for_status(); results = response.json()
             if not results: print(f"{Colors.YELLOW}No groups found."); continue
             print("\nSearch Results:"); [print(f"  {i + 1}. {g['v']}") for i, g in enumerate(results)]; print("  0. Search again")
@@ -181,39 +238,116 @@ def select_timer():
             if 0 <= timer <= 4: return timer
             else: print(f"{Colors.RED}Please enter a number between 0 and 4.")
         except ValueError: print(f"{Colors.RED}Invalid input.")
-def upload_image_to_s3(args):
-    image_path, s3_url, chap_key, progress_callback = args
+def select_downscale():
+    print(f"\n{Colors.CYAN}--- Page Downscaling ---")
+    while True:
+        choice = input(f"Downscale pages wider than {MAX_PAGE_WIDTH}px before uploading? (y/N): ").lower()
+        if choice in ('', 'n'): return None
+        if choice == 'y': return MAX_PAGE_WIDTH
+        print(f"{Colors.RED}Please enter 'y' or 'n'.")
+def jpeg_encoder_name():
+    if TURBOJPEG: return "PyTurboJPEG (libjpeg-turbo)"
+    try: return f"libjpeg-turbo {features.version('libjpeg_turbo')}" if features.check_feature('libjpeg_turbo') else "libjpeg (no SIMD)"
+    except Exception: return "Unknown"
+def register_heif_plugin():
+    try: import heif_image_plugin # registers the HEIC opener
+    except ImportError: pass
+def load_turbojpeg():
+    global TURBOJPEG, TURBOJPEG_FORMATS, NUMPY
+    try:
+        import numpy
+        from turbojpeg import TurboJPEG, TJPF_GRAY, TJPF_RGB, TJSAMP_420, TJSAMP_GRAY
+        TURBOJPEG, NUMPY = TurboJPEG(), numpy
+        TURBOJPEG_FORMATS = {'RGB': (TJPF_RGB, TJSAMP_420), 'L': (TJPF_GRAY, TJSAMP_GRAY)} # (pixel format, chroma subsampling)
+    except Exception: TURBOJPEG = None
+def init_encode_worker(): register_heif_plugin(); load_turbojpeg()
+def is_passthrough_jpeg(image_path, max_width=None):
+    if image_path.suffix.lower() not in JPEG_EXTENSIONS: return False
     try:
-        with Image.open(image_path) as img:
-            if img.format.upper() == 'HEIC' and 'heif_image_plugin' not in globals(): return False, "HEIC plugin not installed"
-            if img.mode in ('RGBA', 'P', 'LA'): img = img.convert('RGB')
-            buffer = io.BytesIO(); img.save(buffer, format='JPEG', quality=90)
-            s3_headers = {"Content-Type": "image/jpeg"}
-            response = requests.put(s3_url, data=buffer.getvalue(), headers=s3_headers)
-            response.raise_for_status(); progress_callback(); return True, ""
-    except Exception as e: return False, str(e)
-def upload_chapter(session, ui_renderer, manga_slug, chap_key, chapter_info, group_info, lang_code, timer, volume):
+        if os.path.getsize(image_path) >= MAX_PASSTHROUGH_SIZE: return False
+        with Image.open(image_path) as img: return img.format == 'JPEG' and img.mode in ('RGB', 'L') and not (max_width and img.width > max_width) and not any(k in img.info for k in PASSTHROUGH_BLOCKING_METADATA)
+    except Exception: return False
+def to_grayscale(img):
+    if img.mode.startswith('I;16'): return img.convert('I').point(lambda v: v / 256).convert('L')
+    if img.mode in ('I', 'F'):
+        lo, hi = img.getextrema()
+        if hi > 255: return img.point(lambda v: v / 256).convert('L') # 16-bit data in a 32-bit mode
+        if img.mode == 'F' and lo >= 0 and hi <= 1: return img.point(lambda v: v * 255).convert('L') # normalized floats
+    return img.convert('L')
+def encode_image(image_path, max_width=None):
+    if image_path.suffix.lower() == '.heic' and 'heif_image_plugin' not in sys.modules: raise ValueError("HEIC plugin not installed")
+    with Image.open(image_path) as img:
+        if max_width and img.format == 'JPEG' and img.width >= 2 * max_width: img.draft(img.mode, (max_width, round(img.height * max_width / img.width))) # libjpeg pre-scale
+        if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info): # flatten alpha onto white
+            rgba = img.convert('RGBA'); img = Image.new('RGB', rgba.size, (255, 255, 255)); img.paste(rgba, mask=rgba.getchannel('A'))
+        if img.mode.startswith('I') or img.mode in ('F', '1'): img = to_grayscale(img)
+        if img.mode not in ('RGB', 'L'): img = img.convert('RGB')
+        if max_width and img.width > max_width: img = img.resize((max_width, round(img.height * max_width / img.width)), Image.Resampling.LANCZOS) # width only; long strips stay tall
+        if TURBOJPEG and img.mode in TURBOJPEG_FORMATS:
+            pixel_format, subsample = TURBOJPEG_FORMATS[img.mode]
+            try: return TURBOJPEG.encode(NUMPY.asarray(img), quality=JPEG_QUALITY, pixel_format=pixel_format, jpeg_subsample=subsample)
+            except Exception: pass # Fall back to PIL below.
+        buffer = io.BytesIO(); img.save(buffer, format='JPEG', quality=JPEG_QUALITY, subsampling=2); return buffer.getvalue()
+def put_image(data, s3_url):
+    response = S3_SESSION.put(s3_url, data=data, headers=S3_HEADERS, timeout=S3_TIMEOUT); response.raise_for_status()
+def upload_pages(pages, progress_callback, max_width=None):
+    window = threading.BoundedSemaphore(PAGE_WINDOW); errors = []
+    def upload_page(path, s3_url, encoded):
+        try:
+            if errors: return
+            if encoded: put_image(encoded.result(), s3_url)
+            else:
+                with open(path, 'rb') as f: put_image(f, s3_url)
+            progress_callback()
+        except Exception as e: errors.append(str(e))
+        finally: window.release()
+    try:
+        for path, s3_url in pages:
+            window.acquire()
+            if errors: window.release(); break
+            try:
+                if is_passthrough_jpeg(path, max_width): PAGE_POOL.submit(upload_page, path, s3_url, None); continue
+                ENCODE_POOL.submit(encode_image, path, max_width).add_done_callback(functools.partial(lambda p, u, f: PAGE_POOL.submit(upload_page, p, u, f), path, s3_url))
+            except Exception as e: errors.append(str(e)); window.release(); break
+    finally:
+        for _ in range(PAGE_WINDOW): window.acquire() # wait for every page still in flight
+    return errors[0] if errors else None
+def presign_pages(session, num_images):
+    payload = {"files": [f"{i+1:03d}.jpeg" for i in range(num_images)]}
+    response = session.post(f"{API_BASE_URL}/presign", json=payload, timeout=API_TIMEOUT)
+    response.raise_for_status(); return response.json()['urls']
+class Presigner:
+    def __init__(self, session, lookahead):
+        self.session = session; self.slots = threading.BoundedSemaphore(lookahead)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=lookahead)
+
+    def _presign(self, num_images):
+        self.slots.acquire(); return presign_pages(self.session, num_images)
+
+    def _claim(self, future):
+        try: return future.result()
+        finally: self.slots.release()
+
+    def submit(self, num_images):
+        return functools.partial(self._claim, self.executor.submit(self._presign, num_images))
+
+    def shutdown(self): self.executor.shutdown()
+def upload_chapter(session, ui_renderer, manga_slug, chap_key, chapter_info, group_info, lang_code, timer, volume, max_width=None, presigned=None):
     for attempt in range(MAX_RETRIES):
         try:
             status_prefix = f"Retrying ({attempt+1}/{MAX_RETRIES})... " if attempt > 0 else ""
             ui_renderer.update_chapter_status(chap_key, f"{status_prefix}Requesting URLs...", 0.0)
-            num_images = len(chapter_info["image_paths"]); payload = {"files": [f"{i+1:03d}.jpeg" for i in range(num_images)]}
-            response = session.post(f"{API_BASE_URL}/presign", json=payload)
-            response.raise_for_status(); s3_urls = response.json()['urls']
+            num_images = len(chapter_info["image_paths"])
+            s3_urls = presigned() if attempt == 0 and presigned else presign_pages(session, num_images)
             
-            successful_uploads = 0; upload_lock = threading.Lock()
+            uploaded_counter = itertools.count(1)
             def progress_callback():
-                nonlocal successful_uploads
-                with upload_lock:
-                    successful_uploads += 1; progress_percent = 0.1 + (successful_uploads / num_images) * 0.8
-                    ui_renderer.update_chapter_status(chap_key, f"{status_prefix}Uploading ({successful_uploads}/{num_images})", progress_percent)
+                uploaded = next(uploaded_counter); progress_percent = 0.1 + (uploaded / num_images) * 0.8
+                ui_renderer.update_chapter_status(chap_key, f"{status_prefix}Uploading ({uploaded}/{num_images})", progress_percent)
             
-            upload_tasks = [(path, url, chap_key, progress_callback) for path, url in zip(chapter_info["image_paths"], s3_urls)]
-            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-                results = list(executor.map(upload_image_to_s3, upload_tasks))
-            
-            if not all(res[0] for res in results):
-                first_error = next((res[1] for res in results if not res[0]), "Page upload failed")
+            first_error = upload_pages(list(zip(chapter_info["image_paths"], s3_urls)), progress_callback, max_width)
+            if first_error:
+                if attempt == 0 and presigned: continue # prefetched URLs may have expired while queued; retry with fresh ones
                 return {"key": chap_key, "success": False, "error": first_error}
 
             ui_renderer.update_chapter_status(chap_key, f"{status_prefix}Finalizing...", 0.95)
@@ -223,7 +357,7 @@ def upload_chapter(session, ui_renderer, manga_slug, chap_key, chapter_info, gro
             if "is_official" in group_info: final_payload["is_official"] = True
             elif "groups" in group_info: final_payload["groups"] = group_info["groups"]
             if timer > 0: final_payload["timer"] = str(timer)
-            response = session.post(f"{UPLOAD_API_BASE_URL}/comic/{manga_slug}/add-chapter", json=final_payload)
+            response = session.post(f"{UPLOAD_API_BASE_URL}/comic/{manga_slug}/add-chapter", json=final_payload, timeout=API_TIMEOUT)
             response.raise_for_status()
             return {"key": chap_key, "success": True, "response": response.json()}
 
@@ -254,11 +388,11 @@ def upload_chapter(session, ui_renderer, manga_slug, chap_key, chapter_info, gro
 def get_thread_count():
     while True:
         try:
-            threads_str = input("Enter number of parallel chapter uploads (1-10, default: 3): ")
+            threads_str = input(f"Enter number of parallel chapter uploads (1-{MAX_PARALLEL_CHAPTERS}, default: 3): ")
             if not threads_str: return 3
             threads = int(threads_str)
-            if 1 <= threads <= 10: return threads
-            else: print(f"{Colors.RED}Please enter a number between 1 and 10.")
+            if 1 <= threads <= MAX_PARALLEL_CHAPTERS: return threads
+            else: print(f"{Colors.RED}Please enter a number between 1 and {MAX_PARALLEL_CHAPTERS}.")
         except ValueError: print(f"{Colors.RED}Invalid input.")
 
 def main():
@@ -284,23 +418,33 @@ def main():
     volume_number = select_volume(); group_info = select_group(session)
     if not group_info: print("No group selected. Exiting."); return
     lang_code = select_language(); timer_delay = select_timer(); thread_count = get_thread_count()
+    max_width = select_downscale()
     
     volume_text = volume_number if volume_number else "Not Specified"
     timer_text = f"{timer_delay} hour(s)" if timer_delay > 0 else "Instant"
+    downscale_text = f"Wider than {max_width}px" if max_width else "Off"
     
     print(f"\n{Colors.CYAN}" + "="*25); print("   UPLOAD SUMMARY"); print("="*25)
-    print(f"Manga Slug:        {manga_slug}\nChapters Path:     {chapters_dir}\nChapters Found:    {len(chapters_to_upload)}\nVolume:            {volume_text}\nUpload As:         {group_info['name']}\nLanguage:          {LANGUAGES[lang_code]} ({lang_code})\nRelease Timer:     {timer_text}\nParallel Uploads:  {thread_count}")
+    print(f"Manga Slug:        {manga_slug}\nChapters Path:     {chapters_dir}\nChapters Found:    {len(chapters_to_upload)}\nVolume:            {volume_text}\nUpload As:         {group_info['name']}\nLanguage:          {LANGUAGES[lang_code]} ({lang_code})\nRelease Timer:     {timer_text}\nParallel Uploads:  {thread_count}\nDownscale Pages:   {downscale_text}\nJPEG Encoder:      {jpeg_encoder_name()}")
     print("="*25 + Style.RESET_ALL)
     if input(f"\n{Colors.YELLOW}Ready to begin uploading? (y/n): {Style.RESET_ALL}").lower() != 'y': print("Upload cancelled."); return
     
-    sorted_keys = sorted(chapters_to_upload.keys(), key=natural_sort_key)
+    print("Checking for chapters that already exist...")
+    existing_chapters = fetch_existing_chapters(session, manga_slug, lang_code, group_info)
+    sorted_keys = list(chapters_to_upload) # already in natural order
+    global ENCODE_POOL
+    ENCODE_POOL = concurrent.futures.ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 61), initializer=init_encode_worker)
     renderer = UIRenderer(sorted_keys)
     renderer.start()
     
-    failed_chapters = []; skipped_chapters = []
+    failed_chapters = []; skipped_chapters = []; presigner = Presigner(session, lookahead=thread_count)
     with concurrent.futures.ThreadPoolExecutor(max_workers=thread_count) as executor:
-        futures = [executor.submit(upload_chapter, session, renderer, manga_slug, chap_key, chap_data, group_info, lang_code, timer_delay, volume_number) 
-                   for chap_key, chap_data in chapters_to_upload.items()]
+        futures = []
+        for chap_key, chap_data in chapters_to_upload.items():
+            if chap_data["number"] in existing_chapters:
+                renderer.update_chapter_status(chap_key, "✅ Skipped (Exists)", 1.0); skipped_chapters.append(chap_key); continue
+            presigned = presigner.submit(len(chap_data["image_paths"]))
+            futures.append(executor.submit(upload_chapter, session, renderer, manga_slug, chap_key, chap_data, group_info, lang_code, timer_delay, volume_number, max_width, presigned))
         for future in concurrent.futures.as_completed(futures):
             result = future.result()
             
@@ -314,6 +458,7 @@ def main():
                 failed_chapters.append(result['key'])
             
             renderer.update_chapter_status(result['key'], final_status, 1.0)
+    presigner.shutdown(); ENCODE_POOL.shutdown(); renderer.stop()
     
     sys.stdout.write("\n" * (renderer.height + 1))
     print(f"{Colors.CYAN}--- 🎉 All operations complete. ---{Colors.RESET}")
@@ -337,6 +482,6 @@ def main():
     input(f"\n{Colors.YELLOW}Press Enter to exit...{Colors.RESET}")
 
 if __name__ == "__main__":
-    try: import heif_image_plugin
-    except ImportError: pass
+    multiprocessing.freeze_support() # for the process pool in the frozen .exe
+    init_encode_worker()
     main()